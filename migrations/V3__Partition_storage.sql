@@ -0,0 +1,23 @@
+-- Moves STORAGE to a layout hash-partitioned by namespace so maintenance and schema changes can work one partition at a time,
+-- and namespace-scoped queries only touch a single partition's (smaller) index.
+-- MySQL requires every unique key to include the partitioning column, so (namespace, key) becomes the primary key,
+-- which also replaces the now redundant idx_namespace_key.
+-- Note: This ALTER rebuilds the table in place. For large tables, run `make db-partition` first, which performs the same change
+-- online with a chunked copy-and-swap. This migration then detects the partitioned table and does nothing.
+-- Note: V1 has no unique constraint, so STORAGE may hold duplicate (namespace, key) rows, which make ADD PRIMARY KEY fail.
+-- Check first with `SELECT namespace, key FROM STORAGE GROUP BY namespace, key HAVING COUNT(*) > 1` and remove any duplicates
+-- (`make db-partition` runs the same check and aborts, listing them).
+SET @already_partitioned = (
+    SELECT COUNT(*) FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND UPPER(TABLE_NAME) = 'STORAGE' AND PARTITION_NAME IS NOT NULL
+);
+
+SET @partition_storage = IF(
+    @already_partitioned = 0,
+    'ALTER TABLE STORAGE DROP INDEX idx_namespace_key, ADD PRIMARY KEY (`namespace`, `key`) PARTITION BY KEY (`namespace`) PARTITIONS 16',
+    'DO 0'
+);
+
+PREPARE partition_storage FROM @partition_storage;
+EXECUTE partition_storage;
+DEALLOCATE PREPARE partition_storage;
@@ -0,0 +1,400 @@
+import argparse
+import os
+import sys
+import time
+
+import pymysql
+from dotenv import load_dotenv
+
+# Load env variables from .env file
+load_dotenv()
+
+# Retrieve the env variables
+db_host = os.getenv("DB_HOST")
+db_port = int(os.getenv("DB_PORT", 3306))
+db_user = os.getenv("DB_USER")
+db_password = os.getenv("DB_PASSWORD")
+db_name = os.getenv("DB_NAME")
+
+# Check if required env variables are set
+if not db_host or not db_user or not db_password or not db_name:
+    print("Error: Missing 1+ environment variables.")
+    sys.exit(1)
+
+# Partitioned layout from V3__Partition_storage.sql, built under the shadow table name
+PARTITIONED_STORAGE_DDL = """
+    CREATE TABLE STORAGE_new (
+        `namespace` VARCHAR(255) NOT NULL,
+        `key` VARCHAR(255) NOT NULL,
+        `value` VARCHAR(255) NOT NULL,
+        PRIMARY KEY (`namespace`, `key`)
+    ) ENGINE=InnoDB
+    PARTITION BY KEY (`namespace`) PARTITIONS 16
+"""
+
+# Seconds a statement waits for a metadata lock on STORAGE before giving up, instead of the server default of a year.
+# A pending DDL statement blocks every later query on the table, so waiting behind a long transaction would stall traffic.
+LOCK_WAIT_TIMEOUT = 2
+# Attempts for statements that need an exclusive metadata lock on STORAGE, with exponential backoff in between
+DDL_ATTEMPTS = 10
+# MySQL error code for both metadata and row lock wait timeouts
+ER_LOCK_WAIT_TIMEOUT = 1205
+
+# Keep the shadow table in sync with writes to STORAGE while rows are being copied
+TRIGGERS = {
+    "storage_online_insert": """
+        CREATE TRIGGER storage_online_insert AFTER INSERT ON STORAGE FOR EACH ROW
+        REPLACE INTO STORAGE_new (`namespace`, `key`, `value`) VALUES (NEW.`namespace`, NEW.`key`, NEW.`value`)
+    """,
+    "storage_online_update": """
+        CREATE TRIGGER storage_online_update AFTER UPDATE ON STORAGE FOR EACH ROW
+        BEGIN
+            DELETE FROM STORAGE_new WHERE `namespace` = OLD.`namespace` AND `key` = OLD.`key`;
+            REPLACE INTO STORAGE_new (`namespace`, `key`, `value`) VALUES (NEW.`namespace`, NEW.`key`, NEW.`value`);
+        END
+    """,
+    "storage_online_delete": """
+        CREATE TRIGGER storage_online_delete AFTER DELETE ON STORAGE FOR EACH ROW
+        DELETE FROM STORAGE_new WHERE `namespace` = OLD.`namespace` AND `key` = OLD.`key`
+    """,
+}
+
+
+def get_connection():
+    """
+    Returns a READ COMMITTED connection, so the locking reads of each copied chunk take record locks only, not gap locks,
+    and inserts of new keys by /set traffic are not blocked by the chunk being copied.
+    Metadata lock waits time out after LOCK_WAIT_TIMEOUT seconds (see run_ddl).
+    """
+    connection = pymysql.connect(
+        host=db_host, port=db_port, user=db_user, password=db_password, database=db_name
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
+        cursor.execute(f"SET SESSION lock_wait_timeout = {LOCK_WAIT_TIMEOUT}")
+    return connection
+
+
+def run_ddl(cursor, statement):
+    """
+    Runs a statement that needs an exclusive metadata lock on STORAGE. If a long transaction holds the table, the
+    statement times out quickly, letting queued /get and /set traffic through, and is retried with exponential backoff.
+    """
+    for attempt in range(1, DDL_ATTEMPTS + 1):
+        try:
+            cursor.execute(statement)
+            return
+        except pymysql.err.OperationalError as e:
+            if e.args[0] != ER_LOCK_WAIT_TIMEOUT or attempt == DDL_ATTEMPTS:
+                raise
+            backoff = 2**attempt / 10
+            print(f"Metadata lock wait timed out, retrying in {backoff:.1f}s...")
+            time.sleep(backoff)
+
+
+def throttle(cursor, sleep, max_threads_running):
+    """
+    Pauses between chunks, and keeps backing off while the server is busier than max_threads_running.
+    """
+    time.sleep(sleep)
+    while True:
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+        threads_running = int(cursor.fetchone()[1])
+        if threads_running <= max_threads_running:
+            return
+        print(f"Server busy ({threads_running} threads running), backing off...")
+        time.sleep(max(sleep, 1))
+
+
+def drop_triggers(cursor):
+    for name in TRIGGERS:
+        run_ddl(cursor, f"DROP TRIGGER IF EXISTS {name}")
+
+
+def get_partitions(cursor):
+    """
+    Returns the partition names of STORAGE in order, or an empty list if it is not partitioned.
+    """
+    cursor.execute("""
+            SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND UPPER(TABLE_NAME) = 'STORAGE'
+            AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_duplicates(cursor, limit=20):
+    """
+    Returns up to limit (namespace, key, count) rows that appear more than once in STORAGE. V1 has no unique constraint,
+    so concurrent /set requests may have inserted the same key twice.
+    """
+    cursor.execute(
+        """
+            SELECT `namespace`, `key`, COUNT(*) FROM STORAGE
+            GROUP BY `namespace`, `key`
+            HAVING COUNT(*) > 1
+            LIMIT %s
+        """,
+        (limit,),
+    )
+    return cursor.fetchall()
+
+
+def copy_and_swap(create_ddl, chunk_size, sleep, max_threads_running, drop_old):
+    """
+    Applies a schema change to STORAGE without locking it for the duration of the rebuild:
+       1. Creates the shadow table STORAGE_new from create_ddl (same columns, new layout).
+       2. Installs triggers that mirror concurrent inserts, updates, and deletes into STORAGE_new.
+       3. Copies existing rows in (namespace, key) order, one chunk per transaction, throttling between chunks.
+          INSERT IGNORE keeps any newer row a trigger already wrote. The chunk is read with LOCK IN SHARE MODE, so a
+          concurrent delete either commits first (and the row is not copied) or waits for the chunk to commit (and its
+          trigger then removes the copied row), instead of a deleted row being resurrected after the swap.
+       4. Atomically renames STORAGE to STORAGE_old and STORAGE_new to STORAGE, then drops the triggers.
+
+    Aborts before creating anything if a previous migration left STORAGE_new or STORAGE_old behind, or if STORAGE holds
+    duplicate (namespace, key) rows, which INSERT IGNORE would otherwise silently collapse to an arbitrary value.
+    If the copy fails or is interrupted, the triggers and shadow table are removed again.
+
+    Note: Creating triggers requires the TRIGGER privilege, and SUPER or log_bin_trust_function_creators when binary logging is on.
+    """
+
+    connection = get_connection()
+    installed = False
+    try:
+        with connection.cursor() as cursor:
+            for table, hint in [
+                ("STORAGE_new", "Run `abort` to clean up a previous migration first."),
+                ("STORAGE_old", "Drop it once the previous migration is verified."),
+            ]:
+                cursor.execute(f"SHOW TABLES LIKE '{table}'")
+                if cursor.fetchone():
+                    print(f"Error: {table} already exists. {hint}")
+                    sys.exit(1)
+
+            duplicates = get_duplicates(cursor)
+            if duplicates:
+                print("Error: STORAGE has duplicate (namespace, key) rows:")
+                for namespace, key, count in duplicates:
+                    print(f"   namespace {namespace}, key {key}: {count} rows")
+                print(
+                    "Remove the duplicates, keeping the intended value, and run again."
+                )
+                sys.exit(1)
+
+            installed = True
+            print("Creating shadow table STORAGE_new.")
+            cursor.execute(create_ddl)
+            for name, trigger in TRIGGERS.items():
+                print(f"Creating trigger {name}.")
+                run_ddl(cursor, trigger)
+
+            copied = 0
+            lower = None
+            while True:
+                # Keyset pagination on (namespace, key) walks the index instead of scanning with OFFSET from the start
+                after_lower = "TRUE"
+                params = []
+                if lower:
+                    after_lower = (
+                        "(`namespace` > %s OR (`namespace` = %s AND `key` > %s))"
+                    )
+                    params = [lower[0], lower[0], lower[1]]
+
+                cursor.execute(
+                    f"""
+                        SELECT `namespace`, `key` FROM STORAGE
+                        WHERE {after_lower}
+                        ORDER BY `namespace`, `key`
+                        LIMIT 1 OFFSET %s
+                    """,
+                    params + [chunk_size - 1],
+                )
+                upper = cursor.fetchone()
+
+                up_to_upper = "TRUE"
+                if upper:
+                    up_to_upper = (
+                        "(`namespace` < %s OR (`namespace` = %s AND `key` <= %s))"
+                    )
+                    params += [upper[0], upper[0], upper[1]]
+
+                cursor.execute(
+                    f"""
+                        INSERT IGNORE INTO STORAGE_new (`namespace`, `key`, `value`)
+                        SELECT `namespace`, `key`, `value` FROM STORAGE
+                        WHERE {after_lower} AND {up_to_upper}
+                        LOCK IN SHARE MODE
+                    """,
+                    params,
+                )
+                connection.commit()
+                copied += cursor.rowcount
+                print(f"Copied {copied} rows into STORAGE_new.")
+
+                if not upper:
+                    break
+                lower = upper
+                throttle(cursor, sleep, max_threads_running)
+
+            print("Swapping STORAGE_new in for STORAGE.")
+            run_ddl(
+                cursor, "RENAME TABLE STORAGE TO STORAGE_old, STORAGE_new TO STORAGE"
+            )
+            drop_triggers(cursor)
+
+            if drop_old:
+                print("Dropping STORAGE_old.")
+                cursor.execute("DROP TABLE STORAGE_old")
+            else:
+                print(
+                    "Previous table kept as STORAGE_old. Drop it once the new layout is verified."
+                )
+            connection.commit()
+
+    except (pymysql.MySQLError, KeyboardInterrupt) as e:
+        print(f"Error during online migration: {e!r}")
+        if installed:
+            try:
+                abort()
+            except Exception as cleanup_error:
+                print(f"Error removing triggers: {cleanup_error}")
+                print("Run `abort` to remove the shadow table and triggers.")
+        sys.exit(1)
+    finally:
+        connection.close()
+
+
+def abort():
+    """
+    Removes the triggers and shadow table left behind by an interrupted migration. STORAGE itself is untouched.
+    """
+
+    connection = get_connection()
+    try:
+        with connection.cursor() as cursor:
+            drop_triggers(cursor)
+            cursor.execute("DROP TABLE IF EXISTS STORAGE_new")
+            print("Removed online migration triggers and STORAGE_new.")
+    finally:
+        connection.close()
+
+
+def partition(chunk_size, sleep, max_threads_running, drop_old):
+    """
+    Copy-and-swaps STORAGE into the partitioned layout, unless it is already partitioned (e.g. by V3__Partition_storage.sql).
+    """
+
+    connection = get_connection()
+    try:
+        with connection.cursor() as cursor:
+            partitions = get_partitions(cursor)
+    finally:
+        connection.close()
+
+    if partitions:
+        print(
+            f"STORAGE is already partitioned ({len(partitions)} partitions), nothing to do."
+        )
+        return
+    copy_and_swap(
+        PARTITIONED_STORAGE_DDL, chunk_size, sleep, max_threads_running, drop_old
+    )
+
+
+def maintain(operation, sleep):
+    """
+    Runs ANALYZE or OPTIMIZE on STORAGE one partition at a time, so only a single partition is rebuilt or locked at once.
+    InnoDB does not support OPTIMIZE PARTITION (it rebuilds the whole table), so REBUILD PARTITION is used to reclaim space instead.
+    """
+
+    statement = {"analyze": "ANALYZE", "optimize": "REBUILD"}[operation]
+    connection = get_connection()
+    try:
+        with connection.cursor() as cursor:
+            partitions = get_partitions(cursor)
+            if not partitions:
+                print(
+                    "Error: STORAGE is not partitioned. Run `make db-partition` or `make db-migrate` first."
+                )
+                sys.exit(1)
+
+            for partition_name in partitions:
+                print(f"Running {operation} on partition {partition_name}...")
+                run_ddl(
+                    cursor,
+                    f"ALTER TABLE STORAGE {statement} PARTITION {partition_name}",
+                )
+                cursor.fetchall()
+                time.sleep(sleep)
+            print(f"Partition {operation} executed successfully.")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Online schema changes and per-partition maintenance for STORAGE."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command, help_text in [
+        ("partition", "Copy-and-swap STORAGE into the namespace-partitioned layout."),
+        (
+            "swap",
+            "Copy-and-swap STORAGE into the layout of a CREATE TABLE STORAGE_new statement read from a file.",
+        ),
+    ]:
+        subparser = subparsers.add_parser(command, help=help_text)
+        if command == "swap":
+            subparser.add_argument("ddl_file")
+        subparser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Rows copied per transaction."
+        )
+        subparser.add_argument(
+            "--sleep", type=float, default=0.05, help="Seconds to pause between chunks."
+        )
+        subparser.add_argument(
+            "--max-threads-running",
+            type=int,
+            default=25,
+            help="Back off while the server is busier than this.",
+        )
+        subparser.add_argument(
+            "--drop-old", action="store_true", help="Drop STORAGE_old after the swap."
+        )
+
+    subparsers.add_parser(
+        "abort",
+        help="Remove the shadow table and triggers of an interrupted migration.",
+    )
+
+    maintain_parser = subparsers.add_parser(
+        "maintain", help="ANALYZE or OPTIMIZE STORAGE one partition at a time."
+    )
+    maintain_parser.add_argument("operation", choices=["analyze", "optimize"])
+    maintain_parser.add_argument(
+        "--sleep", type=float, default=1, help="Seconds to pause between partitions."
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "partition":
+        print("Attempting to run online partition...")
+        partition(args.chunk_size, args.sleep, args.max_threads_running, args.drop_old)
+    elif args.command == "swap":
+        with open(args.ddl_file) as ddl_file:
+            create_ddl = ddl_file.read()
+        print("Attempting to run online swap...")
+        copy_and_swap(
+            create_ddl,
+            args.chunk_size,
+            args.sleep,
+            args.max_threads_running,
+            args.drop_old,
+        )
+    elif args.command == "abort":
+        abort()
+    else:
+        print(f"Attempting to run partition {args.operation}...")
+        maintain(args.operation, args.sleep)
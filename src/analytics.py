@@ -0,0 +1,187 @@
+import threading
+import time
+
+
+class CountMinSketch:
+    """
+    Fixed-memory frequency estimator. Each item is hashed into one counter per row, and the estimate is the minimum
+    across rows, so counts may be overestimated (never underestimated) by collisions.
+    Sketches with the same width and depth can be merged by adding their counters together.
+    """
+
+    def __init__(self, width=1024, depth=4):
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, item):
+        # Seeding the built-in hash with the row number gives independent hash functions per row within a process
+        return [hash((row, item)) % self.width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        """
+        Increments the counters for item and returns its new estimated count.
+        """
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(item)):
+            row[index] += count
+            if estimate is None or row[index] < estimate:
+                estimate = row[index]
+        return estimate
+
+    def estimate(self, item):
+        """
+        Returns the estimated count of item.
+        """
+        return min(row[index] for row, index in zip(self.rows, self._indexes(item)))
+
+    def merge(self, other):
+        """
+        Adds the counters of another sketch of the same dimensions into this one.
+        """
+        for row, other_row in zip(self.rows, other.rows):
+            for index, value in enumerate(other_row):
+                if value:
+                    row[index] += value
+
+
+class HeavyHitters:
+    """
+    Tracks the top-K most frequent items of a stream in fixed memory, using a count-min sketch for the frequency estimates.
+    An item only displaces the current minimum of the top-K once its estimate grows past it.
+    """
+
+    def __init__(self, k=20, width=1024, depth=4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.top = dict()
+        self.total = 0
+
+    def add(self, item):
+        """
+        Records one occurrence of item.
+        """
+        self.total += 1
+        estimate = self.sketch.add(item)
+
+        if item in self.top or len(self.top) < self.k:
+            self.top[item] = estimate
+            return
+
+        smallest = min(self.top, key=self.top.get)
+        if estimate > self.top[smallest]:
+            del self.top[smallest]
+            self.top[item] = estimate
+
+
+class SlidingWindowHeavyHitters:
+    """
+    Keeps heavy hitters over a sliding time window by rotating through a fixed ring of buckets, each covering an equal
+    slice of the window. Expired buckets are reset and reused, so memory stays bounded regardless of traffic.
+    """
+
+    def __init__(self, window_seconds=300, buckets=10, k=20, width=1024, depth=4):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / buckets
+        self.k = k
+        self.width = width
+        self.depth = depth
+        self.buckets = [HeavyHitters(k, width, depth) for _ in range(buckets)]
+        self.epochs = [None] * buckets
+
+    def _current(self, now):
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % len(self.buckets)
+        if self.epochs[slot] != epoch:
+            self.buckets[slot] = HeavyHitters(self.k, self.width, self.depth)
+            self.epochs[slot] = epoch
+        return self.buckets[slot]
+
+    def _live(self, now):
+        oldest = int(now // self.bucket_seconds) - len(self.buckets) + 1
+        return [
+            bucket
+            for bucket, epoch in zip(self.buckets, self.epochs)
+            if epoch is not None and epoch >= oldest
+        ]
+
+    def add(self, item, now):
+        """
+        Records one occurrence of item in the bucket covering the given time.
+        """
+        self._current(now).add(item)
+
+    def report(self, now, limit):
+        """
+        Merges the buckets still inside the window and returns the total count and the top items by estimated count.
+        """
+        live = self._live(now)
+        merged = CountMinSketch(self.width, self.depth)
+        candidates = set()
+        total = 0
+        for bucket in live:
+            merged.merge(bucket.sketch)
+            candidates.update(bucket.top)
+            total += bucket.total
+
+        top = sorted(
+            ((item, merged.estimate(item)) for item in candidates),
+            key=lambda pair: pair[1],
+            reverse=True,
+        )
+        return total, top[:limit]
+
+
+class Analytics:
+    """
+    Always-on load analytics fed from the request handlers. Keeps one sliding-window heavy-hitter tracker per operation:
+       - set, get, delete: (namespace, key) pairs read or written
+       - count:            (namespace, value) pairs queried
+       - countGlobal:      values queried across namespaces
+
+    Memory is fixed per operation (buckets * (width * depth counters + k entries)) and recording is a handful of hashes.
+    """
+
+    OPERATIONS = ["set", "get", "delete", "count", "countGlobal"]
+
+    def __init__(self, window_seconds=300, buckets=10, k=20, width=1024, depth=4):
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.k = k
+        self.width = width
+        self.depth = depth
+        self.operations = dict()
+        self.lock = threading.Lock()
+
+    def record(self, operation, **fields):
+        """
+        Records one request for the given operation, identified by its field values (e.g. namespace and key).
+        """
+        item = tuple(fields.items())
+        now = time.time()
+        with self.lock:
+            tracker = self.operations.get(operation)
+            if tracker is None:
+                tracker = SlidingWindowHeavyHitters(
+                    self.window_seconds, self.buckets, self.k, self.width, self.depth
+                )
+                self.operations[operation] = tracker
+            tracker.add(item, now)
+
+    def report(self, operation=None, limit=None):
+        """
+        Returns the request totals and heavy hitters within the sliding window, for one operation or all of them.
+        """
+        limit = limit or self.k
+        now = time.time()
+        report = dict()
+        with self.lock:
+            for name, tracker in self.operations.items():
+                if operation and name != operation:
+                    continue
+                total, top = tracker.report(now, limit)
+                report[name] = {
+                    "total": total,
+                    "top": [dict(item, count=count) for item, count in top],
+                }
+        return {"window_seconds": self.window_seconds, "operations": report}
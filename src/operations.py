@@ -1,6 +1,7 @@
 from functools import wraps
 
 from flask import jsonify, request
+from src.analytics import Analytics
 from src.operationsDao import DataAccessObject
 
 
@@ -13,6 +14,7 @@ class Endpoints:
     def __init__(self, app):
         self.app = app
         self.dao = DataAccessObject()
+        self.analytics = Analytics()
         self.register_routes()
 
     @staticmethod
@@ -88,6 +90,8 @@ class Endpoints:
         )
         self.app.route("/count", methods=["GET"])(self.count_value_in_namespace)
         self.app.route("/countGlobal", methods=["GET"])(self.count_global_value)
+        self.app.route("/admin/hotkeys", methods=["GET"])(self.get_hot_keys)
+        self.app.route("/admin/queries", methods=["GET"])(self.get_query_report)
 
     # Business logic
 
@@ -118,6 +122,7 @@ class Endpoints:
             return self.bad_request(e)
 
         print(f"Attempting to set key {key} to value {value} in namespace {namespace}")
+        self.analytics.record("set", namespace=namespace, key=key)
 
         try:
             self.dao.set(namespace, key, value)
@@ -144,6 +149,7 @@ class Endpoints:
             return self.bad_request(e)
 
         print(f"Attempting to get value for key {key} in namespace {namespace}")
+        self.analytics.record("get", namespace=namespace, key=key)
 
         try:
             value: str = self.dao.get(namespace, key)
@@ -176,6 +182,7 @@ class Endpoints:
             return self.bad_request(e)
 
         print(f"Attempting to delete entry with key {key} in namespace {namespace}")
+        self.analytics.record("delete", namespace=namespace, key=key)
 
         try:
             value: str = self.dao.delete(namespace, key)
@@ -205,6 +212,7 @@ class Endpoints:
         print(
             f"Attempting to count entries with value {value} in namespace {namespace}"
         )
+        self.analytics.record("count", namespace=namespace, value=value)
 
         try:
             count: int = self.dao.count(namespace, value)
@@ -229,9 +237,47 @@ class Endpoints:
             return self.bad_request(e)
 
         print(f"Attempting to count entries with value {value} across namespaces")
+        self.analytics.record("countGlobal", value=value)
 
         try:
             count: int = self.dao.count_global(value)
             return jsonify({"count": count}), 200
         except Exception as e:
             return self.internal_error(e)
+
+    def get_hot_keys(self):
+        """
+        Reports the most requested namespaces, keys, and values per operation over the analytics sliding window.
+        Served from in-memory sketches, so no database connection is needed.
+
+        Returns:
+            400 Bad Request:    Operation is not a tracked operation, or limit is not a positive integer.
+            200 Success:        Returns request totals and heavy hitters per operation.
+        """
+
+        try:
+            operation: str = request.args.get("operation")
+            if operation is not None and operation not in Analytics.OPERATIONS:
+                raise ValueError(
+                    f"operation must be one of {', '.join(Analytics.OPERATIONS)}."
+                )
+            limit = request.args.get("limit")
+            if limit is not None:
+                if not limit.isdigit() or int(limit) <= 0:
+                    raise ValueError("limit must be a positive integer.")
+                limit = int(limit)
+        except Exception as e:
+            return self.bad_request(e)
+
+        return jsonify(self.analytics.report(operation, limit)), 200
+
+    def get_query_report(self):
+        """
+        Reports latency per query fingerprint and the most recent slow query samples with their EXPLAIN plans.
+        Served from the in-memory query profiler, so no database connection is needed.
+
+        Returns:
+            200 Success:        Returns query fingerprint statistics and slow query samples.
+        """
+
+        return jsonify(self.dao.profiler.report()), 200
@@ -3,16 +3,23 @@ import os
 import pymysql
 from dotenv import load_dotenv
 from flask import g
+from src.profiler import QueryProfiler
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Retrieve the environment variables
 db_host = os.getenv("DB_HOST")
+db_port = int(os.getenv("DB_PORT", 3306))
 db_user = os.getenv("DB_USER")
 db_password = os.getenv("DB_PASSWORD")
 db_name = os.getenv("DB_NAME")
 
+# Slow query capture settings (see QueryProfiler)
+slow_query_threshold_ms = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+slow_query_sample_rate = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 0.1))
+slow_query_explain_analyze = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "false") == "true"
+
 
 class DataAccessObject:
     """
@@ -24,8 +31,16 @@ class DataAccessObject:
        - CountGlobal: Counts the instances of specified value across namespaces
 
     A new DB connection is established and closed upon each request.
+    Every query runs through a QueryProfiler, which records its latency and captures diagnostics for slow queries.
     """
 
+    def __init__(self):
+        self.profiler = QueryProfiler(
+            slow_query_threshold_ms,
+            slow_query_sample_rate,
+            slow_query_explain_analyze,
+        )
+
     def get_connection(self):
         """
         If no existing connector found in Flask's global context, creates a new DB connector.
@@ -33,6 +48,7 @@ class DataAccessObject:
         if not hasattr(g, "db_connector"):
             g.db_connector = pymysql.connect(
                 host=db_host,
+                port=db_port,
                 user=db_user,
                 password=db_password,
                 database=db_name,
@@ -74,7 +90,7 @@ class DataAccessObject:
                     print(
                         f"Success inserting key {key} and value {value} in namespace {namespace}."
                     )
-                    cursor.execute(query, (namespace, key, value))
+                    self.profiler.execute(cursor, query, (namespace, key, value))
                 else:
                     query = """
                         UPDATE storage
@@ -84,7 +100,7 @@ class DataAccessObject:
                     print(
                         f"Success updating value to {value} for key {key} in namespace {namespace}."
                     )
-                    cursor.execute(query, (value, namespace, key))
+                    self.profiler.execute(cursor, query, (value, namespace, key))
                 connection.commit()
 
         except Exception as e:
@@ -108,7 +124,7 @@ class DataAccessObject:
                     SELECT `value` FROM STORAGE
                     WHERE `namespace` = %s AND `key` = %s
                 """
-                cursor.execute(retrieve_query, (namespace, key))
+                self.profiler.execute(cursor, retrieve_query, (namespace, key))
                 result = cursor.fetchone()
 
                 if result:
@@ -148,7 +164,9 @@ class DataAccessObject:
                     print(
                         f"Success deleting key {key} and value {existing_value} from namespace {namespace}."
                     )
-                    cursor.execute(query, (namespace, key, existing_value))
+                    self.profiler.execute(
+                        cursor, query, (namespace, key, existing_value)
+                    )
                     connection.commit()
                     return existing_value
                 else:
@@ -177,7 +195,7 @@ class DataAccessObject:
                     SELECT COUNT(`value`) FROM STORAGE
                     WHERE `namespace` = %s AND `value` = %s
                 """
-                cursor.execute(retrieve_query, (namespace, value))
+                self.profiler.execute(cursor, retrieve_query, (namespace, value))
                 result = cursor.fetchall()
 
                 print(
@@ -205,7 +223,7 @@ class DataAccessObject:
                     SELECT COUNT(*) FROM STORAGE
                     WHERE `value` = %s
                 """
-                cursor.execute(retrieve_query, (value))
+                self.profiler.execute(cursor, retrieve_query, (value))
                 result = cursor.fetchall()
 
                 print(f"Success getting count of value {value}.")
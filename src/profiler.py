@@ -0,0 +1,177 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+
+# Picoseconds per millisecond, the unit of performance_schema timers
+PS_TIMER_PER_MS = 10**9
+
+
+def fingerprint(query):
+    """
+    Normalizes a query so executions differing only in literals or whitespace are grouped together.
+    """
+    query = re.sub(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"", "?", query)
+    query = re.sub(r"%s|\b\d+\b", "?", query)
+    return re.sub(r"\s+", " ", query).strip()
+
+
+class QueryProfiler:
+    """
+    Wraps cursor.execute to time every query the DataAccessObject runs. Keeps, per query fingerprint, the number of
+    executions, latency, and rows returned or affected.
+
+    When a query runs longer than the threshold, a sample of those executions also captures, on the same connection:
+       - Rows examined and lock wait time of the statement, from performance_schema (if enabled)
+       - The EXPLAIN plan (EXPLAIN ANALYZE for SELECTs when enabled, as it re-runs the query)
+
+    Queries that raise are still timed and, when slow, sampled as failed, but no further statements are sent on what may
+    be a broken connection. Slow samples are kept in a bounded ring buffer, so a missing index (high rows examined, full scan in the plan) can be
+    told apart from a lock wait (high lock time) without enabling MySQL's global slow query log.
+    """
+
+    def __init__(
+        self,
+        threshold_ms=100,
+        sample_rate=0.1,
+        explain_analyze=False,
+        max_samples=100,
+    ):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain_analyze = explain_analyze
+        self.fingerprints = dict()
+        self.slow_queries = deque(maxlen=max_samples)
+        self.lock = threading.Lock()
+
+    def execute(self, cursor, query, params=None):
+        """
+        Executes the query on the cursor, recording its latency and capturing a slow query sample if needed.
+        """
+        start = time.perf_counter()
+        try:
+            result = cursor.execute(query, params)
+        except Exception:
+            self.observe(cursor, query, params, start, failed=True)
+            raise
+        self.observe(cursor, query, params, start, failed=False)
+        return result
+
+    def observe(self, cursor, query, params, start, failed):
+        """
+        Records a finished execution. Profiling is best effort: its own errors are printed, never raised to the caller,
+        so they can neither fail a request nor hide the original database error.
+        """
+        try:
+            latency_ms = (time.perf_counter() - start) * 1000
+            query_fingerprint = fingerprint(query)
+            rows = 0 if failed else max(cursor.rowcount, 0)
+            self.record(query_fingerprint, latency_ms, rows, failed)
+
+            if latency_ms >= self.threshold_ms and random.random() < self.sample_rate:
+                if failed:
+                    self.add_sample({"failed": True}, query_fingerprint, latency_ms)
+                else:
+                    self.capture(cursor, query, params, query_fingerprint, latency_ms)
+        except Exception as e:
+            print(f"Error profiling query: {e}")
+
+    def record(self, query_fingerprint, latency_ms, rows, failed):
+        with self.lock:
+            stats = self.fingerprints.setdefault(
+                query_fingerprint,
+                {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                    "slow_count": 0,
+                    "error_count": 0,
+                },
+            )
+            stats["count"] += 1
+            stats["total_ms"] += latency_ms
+            stats["max_ms"] = max(stats["max_ms"], latency_ms)
+            stats["rows"] += rows
+            if latency_ms >= self.threshold_ms:
+                stats["slow_count"] += 1
+            if failed:
+                stats["error_count"] += 1
+
+    def capture(self, cursor, query, params, query_fingerprint, latency_ms):
+        """
+        Collects diagnostics for a slow query on a separate cursor, so the caller's results are left untouched.
+        Diagnostics are best effort: failures are recorded in the sample instead of failing the request.
+        """
+        sample = dict()
+
+        with cursor.connection.cursor() as diagnostics:
+            try:
+                # The slow statement is the latest completed one on this connection's thread
+                diagnostics.execute("""
+                        SELECT ROWS_EXAMINED, ROWS_SENT, LOCK_TIME, NO_INDEX_USED
+                        FROM performance_schema.events_statements_history
+                        WHERE THREAD_ID = PS_CURRENT_THREAD_ID()
+                        ORDER BY EVENT_ID DESC LIMIT 1
+                    """)
+                statement = diagnostics.fetchone()
+                if statement:
+                    sample["rows_examined"] = statement[0]
+                    sample["rows_sent"] = statement[1]
+                    sample["lock_time_ms"] = statement[2] / PS_TIMER_PER_MS
+                    sample["no_index_used"] = bool(statement[3])
+                else:
+                    sample["statement_error"] = (
+                        "no statement history (performance_schema consumer disabled)"
+                    )
+            except Exception as e:
+                sample["statement_error"] = str(e)
+
+            try:
+                explain = "EXPLAIN"
+                if self.explain_analyze and query.lstrip().upper().startswith("SELECT"):
+                    explain = "EXPLAIN ANALYZE"
+                diagnostics.execute(f"{explain} {query}", params)
+                columns = [column[0] for column in diagnostics.description]
+                sample["explain"] = [
+                    dict(zip(columns, row)) for row in diagnostics.fetchall()
+                ]
+            except Exception as e:
+                sample["explain_error"] = str(e)
+
+        self.add_sample(sample, query_fingerprint, latency_ms)
+
+    def add_sample(self, sample, query_fingerprint, latency_ms):
+        print(f"Slow query ({latency_ms:.1f} ms): {query_fingerprint}")
+        sample.update(
+            fingerprint=query_fingerprint,
+            latency_ms=round(latency_ms, 3),
+            timestamp=time.time(),
+        )
+        with self.lock:
+            self.slow_queries.append(sample)
+
+    def report(self):
+        """
+        Returns per-fingerprint statistics, slowest first, and the captured slow query samples, newest first.
+        """
+        with self.lock:
+            fingerprints = [
+                dict(
+                    stats,
+                    fingerprint=query_fingerprint,
+                    avg_ms=round(stats["total_ms"] / stats["count"], 3),
+                    total_ms=round(stats["total_ms"], 3),
+                    max_ms=round(stats["max_ms"], 3),
+                )
+                for query_fingerprint, stats in self.fingerprints.items()
+            ]
+            slow_queries = list(reversed(self.slow_queries))
+
+        fingerprints.sort(key=lambda stats: stats["total_ms"], reverse=True)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "fingerprints": fingerprints,
+            "slow_queries": slow_queries,
+        }
@@ -1,18 +1,35 @@
 import os
+import re
+from pathlib import Path
 
 import pymysql
 import pytest
 from dotenv import load_dotenv
-from src.app import app
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Each pytest-xdist worker gets its own schema so tests can run in parallel ("main" when running without xdist).
+# The name is derived in every process (workers inherit the controller's environment), always from the application's
+# original DB_NAME, which is kept aside so this file being imported twice never suffixes it twice.
+# TEST_DB_* variables override the connection settings, e.g. to point at a disposable MySQL container.
+# The environment is rewritten before the app is imported so the DataAccessObject connects to the worker's schema.
+os.environ.setdefault("TEST_BASE_DB_NAME", os.getenv("DB_NAME"))
+worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+os.environ["DB_NAME"] = f"{os.environ['TEST_BASE_DB_NAME']}_test_{worker}"
+for variable in ["DB_HOST", "DB_PORT", "DB_USER", "DB_PASSWORD"]:
+    if os.getenv(f"TEST_{variable}"):
+        os.environ[variable] = os.getenv(f"TEST_{variable}")
+
+from src.app import app  # noqa: E402
+
 # Retrieve the environment variables
 db_host = os.getenv("DB_HOST")
+db_port = int(os.getenv("DB_PORT", 3306))
 db_user = os.getenv("DB_USER")
 db_password = os.getenv("DB_PASSWORD")
 db_name = os.getenv("DB_NAME")
+migrations_dir = Path(__file__).resolve().parent.parent / "migrations"
 
 
 @pytest.fixture
@@ -26,24 +43,68 @@ def client():
         yield client
 
 
-def get_db_connection():
+def get_db_connection(database=db_name):
     """Return a connection to the MySQL database"""
     return pymysql.connect(
         host=db_host,
+        port=db_port,
         user=db_user,
         password=db_password,
-        database=db_name,
+        database=database,
+    )
+
+
+def migration_statements():
+    """
+    Yields the SQL statements of the Flyway migrations in version order, so the test schema matches `make db-migrate`
+    without running Flyway itself.
+    """
+    migrations = sorted(
+        migrations_dir.glob("V*__*.sql"),
+        key=lambda path: int(re.match(r"V(\d+)__", path.name).group(1)),
     )
+    for migration in migrations:
+        sql = re.sub(r"--.*", "", migration.read_text())
+        for statement in sql.split(";"):
+            if statement.strip():
+                yield statement
+
+
+@pytest.fixture(scope="session", autouse=True)
+def worker_schema():
+    """Creates this worker's schema once from the migrations and drops it after the session."""
+
+    # Never drop anything but a test schema, whatever the environment says
+    if "_test_" not in db_name:
+        pytest.exit(f"Refusing to recreate non-test schema {db_name}.", returncode=1)
+
+    print(f"Creating test schema {db_name}")
+    connection = get_db_connection(database=None)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{db_name}`")
+            cursor.execute(f"CREATE DATABASE `{db_name}`")
+            cursor.execute(f"USE `{db_name}`")
+            for statement in migration_statements():
+                cursor.execute(statement)
+                cursor.fetchall()
+        connection.commit()
+
+        yield
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{db_name}`")
+    finally:
+        connection.close()
 
 
 @pytest.fixture(scope="function", autouse=True)
-def clear_storage_table():
-    """Helper function to delete all entries in the storage table."""
+def clear_storage_table(worker_schema):
+    """Helper function to empty the storage table between tests."""
 
-    print("Cleaning table STORAGE")
+    print("Truncating table STORAGE")
     connection = get_db_connection()
     with connection.cursor() as cursor:
-        cursor.execute("DELETE FROM storage")
-        connection.commit()
+        cursor.execute("TRUNCATE TABLE STORAGE")
     connection.close()
     yield
@@ -134,3 +134,65 @@ def test_scenario_5(client):
         404,
         {"error": "No key b found in namespace a", "message": "Key Not Found in Table"},
     )
+
+
+def test_hot_keys(client):
+    # Read one key repeatedly and another once
+    client.put("/set", json={"namespace": "hot", "key": "k", "value": "v"})
+    for _ in range(3):
+        client.get("/get", query_string={"namespace": "hot", "key": "k"})
+    client.get("/get", query_string={"namespace": "hot", "key": "cold"})
+    client.get("/countGlobal", query_string={"value": "v"})
+
+    # Most requested key leads the heavy hitters for reads
+    response = client.get("/admin/hotkeys", query_string={"operation": "get"})
+    check_response(response, 200)
+    assert list(response.json["operations"]) == ["get"]
+    top = response.json["operations"]["get"]["top"]
+    hot = [entry for entry in top if entry["namespace"] == "hot"]
+    assert hot[0] == {"namespace": "hot", "key": "k", "count": 3}
+
+    response = client.get("/admin/hotkeys", query_string={"operation": "countGlobal"})
+    check_response(response, 200)
+    assert {"value": "v", "count": 1} in response.json["operations"]["countGlobal"][
+        "top"
+    ]
+
+    response = client.get("/admin/hotkeys", query_string={"limit": 1})
+    check_response(response, 200)
+    assert all(len(op["top"]) == 1 for op in response.json["operations"].values())
+
+    # Invalid limit
+    response = client.get("/admin/hotkeys", query_string={"limit": "abc"})
+    check_response(
+        response,
+        400,
+        {"error": "limit must be a positive integer.", "message": "Bad Request"},
+    )
+
+    # Unknown operation
+    response = client.get("/admin/hotkeys", query_string={"operation": "list"})
+    check_response(
+        response,
+        400,
+        {
+            "error": "operation must be one of set, get, delete, count, countGlobal.",
+            "message": "Bad Request",
+        },
+    )
+
+
+def test_query_report(client):
+    response = client.put("/set", json={"namespace": "a", "key": "b", "value": "c"})
+    check_response(response, 200)
+
+    response = client.get("/admin/queries")
+    check_response(response, 200)
+    fingerprints = {
+        stats["fingerprint"]: stats for stats in response.json["fingerprints"]
+    }
+    insert = fingerprints[
+        "INSERT INTO storage (`namespace`, `key`, `value`) VALUES (?, ?, ?)"
+    ]
+    assert insert["count"] >= 1
+    assert insert["rows"] >= 1
@@ -0,0 +1,171 @@
+import pytest
+from scripts import online_migration
+from tests.conftest import get_db_connection
+
+
+def run_statements(*statements):
+    """
+    Helper method to run statements on the worker's schema from a connection separate to the migration's
+    """
+    connection = get_db_connection()
+    with connection.cursor() as cursor:
+        for statement, params in statements:
+            cursor.execute(statement, params)
+    connection.commit()
+    connection.close()
+
+
+def storage_rows():
+    connection = get_db_connection()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT `namespace`, `key`, `value` FROM STORAGE")
+        rows = set(cursor.fetchall())
+    connection.close()
+    return rows
+
+
+def storage_partitions():
+    connection = get_db_connection()
+    with connection.cursor() as cursor:
+        partitions = online_migration.get_partitions(cursor)
+    connection.close()
+    return partitions
+
+
+def test_copy_and_swap(monkeypatch):
+    run_statements(
+        *[
+            (
+                "INSERT INTO STORAGE (`namespace`, `key`, `value`) VALUES (%s, %s, %s)",
+                ("a", key, "v"),
+            )
+            for key in ["1", "2", "3", "4", "5"]
+        ]
+    )
+
+    # Writes /set and /delete traffic would make while the copy is between chunks
+    concurrent_writes = [
+        # Already copied rows
+        (
+            "UPDATE STORAGE SET `value` = %s WHERE `namespace` = %s AND `key` = %s",
+            ("updated", "a", "1"),
+        ),
+        ("DELETE FROM STORAGE WHERE `namespace` = %s AND `key` = %s", ("a", "2")),
+        # Rows not copied yet
+        (
+            "UPDATE STORAGE SET `value` = %s WHERE `namespace` = %s AND `key` = %s",
+            ("updated", "a", "3"),
+        ),
+        ("DELETE FROM STORAGE WHERE `namespace` = %s AND `key` = %s", ("a", "4")),
+        (
+            "INSERT INTO STORAGE (`namespace`, `key`, `value`) VALUES (%s, %s, %s)",
+            ("z", "6", "new"),
+        ),
+    ]
+
+    def throttle(cursor, sleep, max_threads_running):
+        if concurrent_writes:
+            run_statements(*concurrent_writes)
+            concurrent_writes.clear()
+
+    monkeypatch.setattr(online_migration, "throttle", throttle)
+    online_migration.copy_and_swap(
+        online_migration.PARTITIONED_STORAGE_DDL,
+        chunk_size=2,
+        sleep=0,
+        max_threads_running=25,
+        drop_old=True,
+    )
+
+    assert not concurrent_writes
+    assert storage_rows() == {
+        ("a", "1", "updated"),
+        ("a", "3", "updated"),
+        ("a", "5", "v"),
+        ("z", "6", "new"),
+    }
+    assert len(storage_partitions()) == 16
+
+
+def test_partition_skips_partitioned_table(monkeypatch, capsys):
+    # V3 has already partitioned the test schema's STORAGE
+    def copy_and_swap(*args):
+        raise AssertionError("STORAGE should not be copied again.")
+
+    monkeypatch.setattr(online_migration, "copy_and_swap", copy_and_swap)
+    online_migration.partition(
+        chunk_size=2, sleep=0, max_threads_running=25, drop_old=True
+    )
+
+    assert "already partitioned" in capsys.readouterr().out
+
+
+def test_maintain(capsys):
+    partitions = storage_partitions()
+
+    for operation in ["analyze", "optimize"]:
+        online_migration.maintain(operation, sleep=0)
+
+        output = capsys.readouterr().out
+        for partition in partitions:
+            assert f"Running {operation} on partition {partition}..." in output
+        assert f"Partition {operation} executed successfully." in output
+
+
+def shadow_objects():
+    """
+    Helper method to list leftover shadow tables and online migration triggers
+    """
+    connection = get_db_connection()
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW TABLES LIKE 'STORAGE\\_%'")
+        objects = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SHOW TRIGGERS")
+        objects += [row[0] for row in cursor.fetchall()]
+    connection.close()
+    return objects
+
+
+def test_copy_and_swap_refuses_leftover_old_table():
+    run_statements(("CREATE TABLE STORAGE_old LIKE STORAGE", None))
+    try:
+        with pytest.raises(SystemExit):
+            online_migration.copy_and_swap(
+                online_migration.PARTITIONED_STORAGE_DDL,
+                chunk_size=2,
+                sleep=0,
+                max_threads_running=25,
+                drop_old=True,
+            )
+        # Nothing was created on the live table
+        assert [name.upper() for name in shadow_objects()] == ["STORAGE_OLD"]
+    finally:
+        run_statements(("DROP TABLE STORAGE_old", None))
+
+
+def test_copy_and_swap_cleans_up_when_interrupted(monkeypatch):
+    run_statements(
+        *[
+            (
+                "INSERT INTO STORAGE (`namespace`, `key`, `value`) VALUES (%s, %s, %s)",
+                ("a", key, "v"),
+            )
+            for key in ["1", "2", "3"]
+        ]
+    )
+
+    def throttle(cursor, sleep, max_threads_running):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(online_migration, "throttle", throttle)
+    with pytest.raises(SystemExit):
+        online_migration.copy_and_swap(
+            online_migration.PARTITIONED_STORAGE_DDL,
+            chunk_size=2,
+            sleep=0,
+            max_threads_running=25,
+            drop_old=True,
+        )
+
+    assert shadow_objects() == []
+    assert len(storage_rows()) == 3
@@ -0,0 +1,51 @@
+import pymysql
+import pytest
+from src.profiler import QueryProfiler
+from tests.conftest import get_db_connection
+
+
+def test_slow_query_samples():
+    # Every query is slow and sampled, but only the latest 3 samples are kept
+    profiler = QueryProfiler(threshold_ms=0, sample_rate=1, max_samples=3)
+    connection = get_db_connection()
+    with connection.cursor() as cursor:
+        for namespace in ["a", "b", "c", "d", "e"]:
+            profiler.execute(
+                cursor,
+                "SELECT `value` FROM STORAGE WHERE `namespace` = %s AND `key` = %s",
+                (namespace, "k"),
+            )
+            # The caller's results are not replaced by the diagnostics queries
+            assert cursor.fetchall() == ()
+    connection.close()
+
+    report = profiler.report()
+    assert len(report["slow_queries"]) == 3
+    for sample in report["slow_queries"]:
+        assert sample["fingerprint"] == (
+            "SELECT `value` FROM STORAGE WHERE `namespace` = ? AND `key` = ?"
+        )
+        assert sample["explain"]
+        assert "explain_error" not in sample
+        # Rows examined and lock time come from performance_schema when it is enabled
+        assert "rows_examined" in sample or "statement_error" in sample
+
+    [stats] = report["fingerprints"]
+    assert stats["count"] == 5
+    assert stats["slow_count"] == 5
+
+
+def test_failed_query_is_recorded_without_diagnostics():
+    profiler = QueryProfiler(threshold_ms=0, sample_rate=1, max_samples=3)
+    connection = get_db_connection()
+    with connection.cursor() as cursor:
+        # The original database error reaches the caller
+        with pytest.raises(pymysql.err.ProgrammingError):
+            profiler.execute(cursor, "SELECT * FROM missing_table")
+    connection.close()
+
+    report = profiler.report()
+    [sample] = report["slow_queries"]
+    assert sample["failed"]
+    assert "explain" not in sample
+    assert report["fingerprints"][0]["error_count"] == 1